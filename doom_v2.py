@@ -5,53 +5,215 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, simpledialog
 from tkinter import ttk
 import threading
+import queue
+import collections
+import functools
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
 import datetime
+import time
 import os
+import ntpath
+from pathlib import Path
 import json
+import io
 import zipfile
+import tarfile
+import contextlib
 import tempfile
 import urllib.request
 import urllib.error
 import platform
 import ssl
+import re
 import json as _json
 
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, indent=2).encode('utf-8')
+    _loads = json.loads
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), 'doom_launcher_config.json')
 ENGINES = ["gzdoom", "chocolate-doom", "prboom", "zdoom"]
 CURRENT_LOG_FILE = None
+# Engine output is pushed to the log widget in batches this often
+LOG_FLUSH_MS = 50
+# Engine stdout is read in raw chunks of this size and split into lines in bulk
+PROC_READ_SIZE = 64 * 1024
+
+# Parsed config shared by all callbacks; writes are debounced through the Tk root
+CONFIG_SAVE_DELAY_MS = 500
+_CONFIG_CACHE = {}
+_CONFIG_DIRTY = False
+_CONFIG_FLUSH_JOB = None
+_CONFIG_ROOT = None
 
 # GitHub API endpoint for latest GZDoom release
 GZDOOM_API_LATEST = "https://api.github.com/repos/gzdoom/gzdoom/releases/latest"
 
-root = tk.Tk()
+# Downloads are read in 100 KiB chunks; the status bar is refreshed every N chunks
+DOWNLOAD_CHUNK_SIZE = 100 * 1024
+PROGRESS_EVERY_CHUNKS = 10
 
+# Export decompresses input members on a thread pool (zlib releases the GIL);
+# a single writer thread can't keep more than a few workers busy
+EXPORT_WORKERS = min(os.cpu_count() or 1, 8)
+# Members larger than this are streamed into the export in 1 MiB pieces instead of prefetched
+EXPORT_COPY_BUFSIZE = 1024 * 1024
+EXPORT_STREAM_THRESHOLD = 16 * EXPORT_COPY_BUFSIZE
+# Upper bound on inflated member bytes held by the prefetch queue at once
+EXPORT_PREFETCH_BYTES = 4 * EXPORT_STREAM_THRESHOLD
 
-try:
-    icon = tk.PhotoImage(file="doom_icon.ico")
-except tk.TclError:
-    print("Error: Image file not found or invalid format. Using default icon.")
-    icon = None
+# Export compression presets (config['export_compression']) -> (method, level).
+# Most mod bytes are already compressed or barely compressible, so 'fast' is the default.
+EXPORT_COMPRESSION = {
+    'fast': (zipfile.ZIP_DEFLATED, 1),
+    'normal': (zipfile.ZIP_DEFLATED, None),
+}
+if hasattr(zipfile, 'ZIP_ZSTD'):
+    EXPORT_COMPRESSION['zstd'] = (zipfile.ZIP_ZSTD, None)
+
+# Tarballs can be extracted while downloading, so they win over ZIPs when a release has both
+TAR_SUFFIXES = (('.tar.zst',) if zstandard else ()) + ('.tar.xz', '.tar.gz')
+_TAR_RE = '|'.join(re.escape(suffix) for suffix in TAR_SUFFIXES)
+
+
+def _asset_patterns(platform_re):
+    return [re.compile(rf'{platform_re}.*(?:{_TAR_RE})$', re.I),
+            re.compile(rf'{platform_re}.*\.zip$', re.I)]
+
+
+# GZDoom release asset patterns per platform, in order of preference
+_ASSET_RE = {
+    'Windows': _asset_patterns('windows'),
+    'Darwin': _asset_patterns('(?:macos|osx)') + [re.compile(r'macos|osx', re.I)],
+    'Linux': _asset_patterns('linux'),
+}
 
 
 def load_config():
     try:
         if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(CONFIG_FILE, 'rb') as f:
+                _CONFIG_CACHE.update(_loads(f.read()))
     except Exception as e:
         messagebox.showwarning("Config Warning", f"Could not load config: {e}")
-    return {}
+    return _CONFIG_CACHE
 
 
 def save_config(config):
+    """
+    Mark the cached config dirty and schedule a single write after CONFIG_SAVE_DELAY_MS.
+    """
+    global _CONFIG_DIRTY, _CONFIG_FLUSH_JOB
+    if config is not _CONFIG_CACHE:
+        _CONFIG_CACHE.clear()
+        _CONFIG_CACHE.update(config)
+    _CONFIG_DIRTY = True
+    if _CONFIG_ROOT is None:
+        _flush_config()
+    elif _CONFIG_FLUSH_JOB is None:
+        _CONFIG_FLUSH_JOB = _CONFIG_ROOT.after(CONFIG_SAVE_DELAY_MS, _flush_config)
+
+
+def _flush_config():
+    global _CONFIG_DIRTY, _CONFIG_FLUSH_JOB
+    _CONFIG_FLUSH_JOB = None
+    if not _CONFIG_DIRTY:
+        return
+    _CONFIG_DIRTY = False
     try:
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2)
+        with open(CONFIG_FILE, 'wb') as f:
+            f.write(_dumps(_CONFIG_CACHE))
     except Exception as e:
         messagebox.showwarning("Config Warning", f"Could not save config: {e}")
 
 
-def download_gzdoom(config):
+class _ProgressReader:
+    """
+    File-like wrapper around an HTTP response that shows the bytes read so far in a status label.
+    """
+
+    def __init__(self, resp, status_label=None, message="Downloading..."):
+        self.resp = resp
+        self.status_label = status_label
+        self.message = message
+        self.total = 0
+        self._next_report = PROGRESS_EVERY_CHUNKS * DOWNLOAD_CHUNK_SIZE
+
+    def read(self, size=-1):
+        data = self.resp.read(size)
+        self.total += len(data)
+        if self.status_label and self.total >= self._next_report:
+            self._next_report = self.total + PROGRESS_EVERY_CHUNKS * DOWNLOAD_CHUNK_SIZE
+            # Downloads run on the Tk thread, so repaint the label before reading on
+            self.status_label.config(text=f"{self.message} {self.total / (1024 * 1024):.1f} MB")
+            self.status_label.update_idletasks()
+        return data
+
+
+def copy_download(resp, out, status_label=None, message="Downloading..."):
+    """
+    Copy an HTTP response into a file object in DOWNLOAD_CHUNK_SIZE chunks, reporting progress.
+    """
+    reader = _ProgressReader(resp, status_label, message)
+    while True:
+        chunk = reader.read(DOWNLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        out.write(chunk)
+    return reader.total
+
+
+def _stream_tar(fileobj, dest_dir, mode):
+    with tarfile.open(fileobj=fileobj, mode=mode, bufsize=DOWNLOAD_CHUNK_SIZE) as tf:
+        tf.extractall(dest_dir)
+
+
+def _stream_tar_gz(resp, dest_dir, status_label=None):
+    _stream_tar(_ProgressReader(resp, status_label, "Downloading GZDoom..."), dest_dir, 'r|gz')
+
+
+def _stream_tar_xz(resp, dest_dir, status_label=None):
+    _stream_tar(_ProgressReader(resp, status_label, "Downloading GZDoom..."), dest_dir, 'r|xz')
+
+
+def _stream_tar_zst(resp, dest_dir, status_label=None):
+    progress = _ProgressReader(resp, status_label, "Downloading GZDoom...")
+    with zstandard.ZstdDecompressor().stream_reader(progress) as reader:
+        _stream_tar(reader, dest_dir, 'r|')
+
+
+def _extract_zip(resp, dest_dir, status_label=None):
+    # The ZIP central directory sits at the end, so buffer in memory
+    buf = io.BytesIO()
+    copy_download(resp, buf, status_label, "Downloading GZDoom...")
+    with zipfile.ZipFile(buf, 'r') as zf:
+        zf.extractall(dest_dir)
+
+
+# Archive suffix -> extractor taking (response, dest_dir, status_label)
+_EXTRACTORS = {
+    '.tar.gz': _stream_tar_gz,
+    '.tar.xz': _stream_tar_xz,
+    '.zip': _extract_zip,
+}
+if zstandard:
+    _EXTRACTORS['.tar.zst'] = _stream_tar_zst
+
+
+def download_gzdoom(config, status_label=None):
     """
     Fetch latest GZDoom release via GitHub API, or fallback to hardcoded version if API returns 404.
     """
@@ -59,32 +221,46 @@ def download_gzdoom(config):
     dest_dir = os.path.join(os.path.dirname(__file__), 'engines', 'gzdoom')
     os.makedirs(dest_dir, exist_ok=True)
 
+    # Revalidate the last release listing with its ETag; GitHub answers 304 if unchanged
+    cached = config.get('_gzdoom_release_cache') or {}
+    headers = {"User-Agent": "doom-launcher"}
+    if cached.get('etag') and cached.get('json'):
+        headers['If-None-Match'] = cached['etag']
+
     data = None
     try:
         ctx = ssl.create_default_context()
-        req = urllib.request.Request(GZDOOM_API_LATEST, headers={"User-Agent": "doom-launcher"})
+        req = urllib.request.Request(GZDOOM_API_LATEST, headers=headers)
         with urllib.request.urlopen(req, context=ctx) as resp:
             data = _json.load(resp)
+            etag = resp.headers.get('ETag')
+        if etag:
+            # Only asset names and URLs are used, so keep the cached copy small
+            assets = [{'name': a.get('name', ''), 'browser_download_url': a.get('browser_download_url')}
+                      for a in data.get('assets', [])]
+            config['_gzdoom_release_cache'] = {'etag': etag, 'json': {'assets': assets}}
+            save_config(config)
     except urllib.error.HTTPError as e:
-        if e.code != 404:
+        if e.code == 304:
+            data = cached['json']
+        elif e.code != 404:
             messagebox.showerror("Download Failed", f"Could not fetch GZDoom releases: HTTP {e.code}")
             return None
         # else 404: we'll fall back
     except Exception as e:
-        messagebox.showerror("Download Failed", f"Could not fetch GZDoom releases: {e}")
-        return None
+        if not cached.get('json'):
+            messagebox.showerror("Download Failed", f"Could not fetch GZDoom releases: {e}")
+            return None
+        # Offline: reuse the last known release listing
+        data = cached['json']
 
     asset_url = None
     if data:
         # Select matching asset from API response
-        for asset in data.get('assets', []):
-            name = asset.get('name', '').lower()
-            if system == 'Windows' and 'windows' in name and name.endswith('.zip'):
-                asset_url = asset['browser_download_url']
-            elif system == 'Darwin' and ('macos' in name or 'osx' in name):
-                asset_url = asset['browser_download_url']
-            elif system == 'Linux' and ('linux' in name and name.endswith('.tar.gz')):
-                asset_url = asset['browser_download_url']
+        assets = data.get('assets', [])
+        for rx in _ASSET_RE.get(system, []):
+            asset_url = next((asset['browser_download_url'] for asset in assets
+                              if rx.search(asset.get('name', ''))), None)
             if asset_url:
                 break
     else:
@@ -103,7 +279,8 @@ def download_gzdoom(config):
 
     archive_path = os.path.join(dest_dir, os.path.basename(asset_url))
     try:
-        urllib.request.urlretrieve(asset_url, archive_path)
+        req = urllib.request.Request(asset_url, headers={"User-Agent": "doom-launcher"})
+        resp = urllib.request.urlopen(req)
     except urllib.error.HTTPError as e:
         messagebox.showerror("Download Failed", f"HTTP Error {e.code}: {e.reason}")
         return None
@@ -111,35 +288,33 @@ def download_gzdoom(config):
         messagebox.showerror("Download Failed", f"Error downloading archive: {e}")
         return None
 
-    # Extract archive
+    # Extract archive while it downloads
     try:
-        if archive_path.endswith('.zip'):
-            with zipfile.ZipFile(archive_path, 'r') as zf:
-                zf.extractall(dest_dir)
-        elif archive_path.endswith('.tar.gz'):
-            import tarfile
-            with tarfile.open(archive_path, 'r:gz') as tf:
-                tf.extractall(dest_dir)
-        elif archive_path.endswith('.dmg'):
-            messagebox.showinfo(
-                "Manual Step Required",
-                f"Please mount {archive_path} and copy GZDoom.app to {dest_dir}."
-            )
-            return None
+        with resp:
+            ext = next((ext for ext in _EXTRACTORS if archive_path.endswith(ext)), None)
+            if ext:
+                _EXTRACTORS[ext](resp, dest_dir, status_label)
+            else:
+                with open(archive_path, 'wb') as f:
+                    copy_download(resp, f, status_label, "Downloading GZDoom...")
+                if archive_path.endswith('.dmg'):
+                    messagebox.showinfo(
+                        "Manual Step Required",
+                        f"Please mount {archive_path} and copy GZDoom.app to {dest_dir}."
+                    )
+                    return None
     except Exception as e:
         messagebox.showerror("Extraction Failed", f"Could not extract GZDoom: {e}")
         return None
 
     # Locate the executable
     exe_path = None
-    for root, _, files in os.walk(dest_dir):
-        for file in files:
-            low = file.lower()
-            if 'gzdoom' in low and (low.endswith('.exe') or not os.path.splitext(low)[1]):
-                exe_path = os.path.join(root, file)
-                os.chmod(exe_path, 0o755)
-                break
-        if exe_path:
+    # Case-insensitive substring match on every platform, e.g. GZDoom inside a macOS bundle
+    for p in Path(dest_dir).rglob('*[gG][zZ][dD][oO][oO][mM]*'):
+        name = p.name.lower()
+        if (name.endswith('.exe') or not p.suffix) and p.is_file():
+            exe_path = str(p)
+            p.chmod(0o755)
             break
 
     if not exe_path:
@@ -147,33 +322,76 @@ def download_gzdoom(config):
     return exe_path
 
 
-def find_engine(engine_names, config=None):
+@functools.lru_cache(maxsize=None)
+def _which(name):
+    # PATH lookups are cached for the session; "Rescan" clears the cache
+    return shutil.which(name)
+
+
+def installed_engines():
+    return [name for name in ENGINES if _which(name)]
+
+
+def find_engine(engine_names, config=None, status_label=None):
     for name in engine_names:
-        path = shutil.which(name)
+        path = _which(name)
         if path:
             return path
     if messagebox.askyesno("Engine Not Found", "No DOOM engine found. Download GZDoom now?"):
-        return download_gzdoom(config or {})
+        return download_gzdoom(config or {}, status_label)
     return None
 
 
+def _log_writer(log_fp, log_queue):
+    """
+    Write queued log lines in batches until a None sentinel arrives, then close the file.
+    """
+    done = False
+    while not done:
+        batch = [log_queue.get()]
+        while True:
+            try:
+                batch.append(log_queue.get_nowait())
+            except queue.Empty:
+                break
+        if None in batch:
+            done = True
+            batch = batch[:batch.index(None)]
+        if log_fp and batch:
+            try:
+                log_fp.write('\n'.join(batch) + '\n')
+                log_fp.flush()
+            except Exception:
+                pass
+    if log_fp:
+        log_fp.close()
+
+
 def run_wad(wad_path, engine_choice=None, custom_engine_path=None, mod_paths=None,
             log_widget=None, status_label=None, launch_btn=None, config=None):
     global CURRENT_LOG_FILE
     timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
     CURRENT_LOG_FILE = f"doom_log_{timestamp}.txt"
+    log_queue = queue.Queue()
+    log_buffer = collections.deque()
+    finished = threading.Event()
 
     def log(msg):
         ts = datetime.datetime.now().strftime('%H:%M:%S')
         line = f"[{ts}] {msg}"
         if log_widget:
-            log_widget.insert(tk.END, line + "\n")
+            log_buffer.append(line + "\n")
+        log_queue.put(line)
+
+    def flush_log():
+        batch = []
+        while log_buffer:
+            batch.append(log_buffer.popleft())
+        if batch:
+            log_widget.insert(tk.END, ''.join(batch))
             log_widget.see(tk.END)
-        try:
-            with open(CURRENT_LOG_FILE, 'a', encoding='utf-8') as f:
-                f.write(line + "\n")
-        except Exception:
-            pass
+        if not finished.is_set() or log_buffer:
+            log_widget.after(LOG_FLUSH_MS, flush_log)
 
     if not os.path.isfile(wad_path):
         messagebox.showerror("Error", f"WAD file '{wad_path}' not found.")
@@ -192,17 +410,26 @@ def run_wad(wad_path, engine_choice=None, custom_engine_path=None, mod_paths=Non
     if custom_engine_path:
         engine_path = custom_engine_path
     elif engine_choice and engine_choice != 'Auto':
-        engine_path = shutil.which(engine_choice)
+        engine_path = _which(engine_choice)
         if not engine_path:
             messagebox.showerror("Error", f"Engine '{engine_choice}' not found on PATH.")
             return
     else:
-        engine_path = find_engine(ENGINES, config)
+        engine_path = find_engine(ENGINES, config, status_label)
         if not engine_path:
             return
 
-    cmd = [engine_path, '-iwad', wad_path] + sum([['-file', m] for m in mods], [])
+    cmd = [engine_path, '-iwad', wad_path, *chain.from_iterable(('-file', m) for m in mods)]
+
+    # The log file stays open for the whole run; a writer thread appends lines in batches
+    try:
+        log_fp = open(CURRENT_LOG_FILE, 'a', encoding='utf-8')
+    except Exception:
+        log_fp = None
+    threading.Thread(target=_log_writer, args=(log_fp, log_queue), daemon=True).start()
     log("Launching: " + ' '.join(cmd))
+    if log_widget:
+        log_widget.after(LOG_FLUSH_MS, flush_log)
 
     if status_label:
         status_label.config(text="Launching...")
@@ -211,15 +438,23 @@ def run_wad(wad_path, engine_choice=None, custom_engine_path=None, mod_paths=Non
 
     def launch():
         try:
-            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-            for line in proc.stdout:
-                log(line.strip())
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=0)
+            pending = b''
+            for chunk in iter(lambda: proc.stdout.read(PROC_READ_SIZE), b''):
+                *lines, pending = (pending + chunk).split(b'\n')
+                if lines:
+                    for line in b'\n'.join(lines).decode('utf-8', 'replace').split('\n'):
+                        log(line.strip())
+            if pending:
+                log(pending.decode('utf-8', 'replace').strip())
             proc.wait()
             log("Process finished.")
         except Exception as e:
             log(f"Error: {e}")
             messagebox.showerror("Launch Failed", f"Failed to launch engine: {e}")
         finally:
+            finished.set()
+            log_queue.put(None)
             if status_label:
                 status_label.after(0, lambda: status_label.config(text="Ready"))
             if launch_btn:
@@ -247,9 +482,11 @@ def add_mods(listbox, config):
     if paths:
         config['last_mod_dir'] = os.path.dirname(paths[0])
         save_config(config)
+        existing = set(listbox.get(0, tk.END))
         for p in paths:
-            if p not in listbox.get(0, tk.END):
+            if p not in existing:
                 listbox.insert(tk.END, p)
+                existing.add(p)
 
 
 def remove_selected(listbox):
@@ -257,6 +494,35 @@ def remove_selected(listbox):
         listbox.delete(idx)
 
 
+def _safe_arcname(filename):
+    """
+    Normalise a ZIP member name like ZipFile.extract() does: drop drive, root, '.' and '..' parts.
+    """
+    name = ntpath.splitdrive(filename.replace('\\', '/'))[1]
+    return '/'.join(part for part in name.split('/') if part not in ('', '.', '..'))
+
+
+def _prefetch(executor, fn, items, window, cost=None, budget=None):
+    """
+    Yield (item, fn(item)) in order while keeping up to `window` calls running on the executor.
+    If `budget` is given, the summed cost(item) of calls in flight stays within it as well.
+    """
+    pending = collections.deque()
+    buffered = 0
+    for item in items:
+        item_cost = cost(item) if cost else 0
+        while pending and (len(pending) >= window
+                           or (budget is not None and buffered + item_cost > budget)):
+            ready, fut, ready_cost = pending.popleft()
+            buffered -= ready_cost
+            yield ready, fut.result()
+        pending.append((item, executor.submit(fn, item), item_cost))
+        buffered += item_cost
+    while pending:
+        ready, fut, _ = pending.popleft()
+        yield ready, fut.result()
+
+
 def export_mods(listbox, config, status_label=None):
     mods = list(listbox.get(0, tk.END))
     if not mods:
@@ -274,26 +540,96 @@ def export_mods(listbox, config, status_label=None):
 
     if status_label:
         status_label.config(text="Exporting mods...")
+    method, level = EXPORT_COMPRESSION.get(config.get('export_compression'), EXPORT_COMPRESSION['fast'])
 
+    tmp_path = None
     try:
-        with tempfile.TemporaryDirectory() as tempdir:
+        with contextlib.ExitStack() as stack:
+            # Archive name -> (source zip or None, ZipInfo or file path); later mods win
+            entries = {}
             for p in mods:
                 ext = os.path.splitext(p)[1].lower()
                 if ext in ['.zip', '.pk3']:
-                    with zipfile.ZipFile(p, 'r') as zf:
-                        zf.extractall(tempdir)
+                    zin = stack.enter_context(zipfile.ZipFile(p, 'r'))
+                    for info in zin.infolist():
+                        arc = _safe_arcname(info.filename)
+                        if arc and not info.is_dir():
+                            entries[arc] = (zin, info)
                 else:
-                    shutil.copy(p, os.path.join(tempdir, os.path.basename(p)))
-            with zipfile.ZipFile(out_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-                for root, _, files in os.walk(tempdir):
-                    for file in files:
-                        full = os.path.join(root, file)
-                        arc = os.path.relpath(full, tempdir)
-                        zf.write(full, arc)
+                    entries[os.path.basename(p)] = (None, p)
+
+            # ZipFile.open() bookkeeping isn't thread-safe; decompression in read() runs unlocked
+            open_lock = threading.Lock()
+
+            def open_member(zin, info):
+                with open_lock:
+                    return zin.open(info)
+
+            def close_member(member):
+                with open_lock:
+                    member.close()
+
+            def prefetched(entry):
+                zin, src = entry[1]
+                return zin is not None and src.file_size <= EXPORT_STREAM_THRESHOLD
+
+            def read_member(entry):
+                if not prefetched(entry):
+                    return None
+                zin, src = entry[1]
+                member = open_member(zin, src)
+                try:
+                    return member.read()
+                finally:
+                    close_member(member)
+
+            executor = stack.enter_context(ThreadPoolExecutor(max_workers=EXPORT_WORKERS))
+            # Write beside out_path and swap it in at the end, so exporting over one of the
+            # inputs works and a failed export never leaves a half-written file behind
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(out_path) or '.', suffix='.tmp',
+                                             delete=False) as tmp:
+                tmp_path = tmp.name
+                with zipfile.ZipFile(tmp, 'w', method, compresslevel=level) as zf:
+                    # Members are decompressed ahead on the pool while this thread writes in order
+                    members = _prefetch(executor, read_member, entries.items(), EXPORT_WORKERS * 2,
+                                        cost=lambda entry: entry[1][1].file_size if prefetched(entry) else 0,
+                                        budget=EXPORT_PREFETCH_BYTES)
+                    for (arc, (zin, src)), data in members:
+                        if zin is None:
+                            zf.write(src, arc)
+                            continue
+                        # Stored (already compressed) members stay stored; the rest use the preset
+                        stored = src.compress_type == zipfile.ZIP_STORED
+                        if data is not None:
+                            zf.writestr(arc, data, compress_type=zipfile.ZIP_STORED if stored else None)
+                            continue
+                        # Dated now like the writestr() members, with the same method and level
+                        target = zipfile.ZipInfo(arc, time.localtime()[:6])
+                        if stored:
+                            target.compress_type = zipfile.ZIP_STORED
+                        else:
+                            target.compress_type = method
+                            target._compresslevel = level  # public as compress_level from Python 3.13
+                        member = open_member(zin, src)
+                        try:
+                            with zf.open(target, 'w', force_zip64=src.file_size > zipfile.ZIP64_LIMIT) as dst:
+                                shutil.copyfileobj(member, dst, EXPORT_COPY_BUFSIZE)
+                        finally:
+                            close_member(member)
+        # Inputs are closed by now, so replacing one of them also works on Windows.
+        # The temp file is created 0600; give the export the usual umask-based mode.
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, out_path)
+        tmp_path = None
         messagebox.showinfo("Success", f"Combined mod exported to {out_path}")
     except Exception as e:
         messagebox.showerror("Error", f"Failed to export combined mod: {e}")
     finally:
+        if tmp_path:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
         if status_label:
             status_label.config(text="Ready")
 
@@ -318,10 +654,21 @@ def clear_log_widget(log_widget):
 
 
 def create_gui():
+    global _CONFIG_ROOT
+    root = tk.Tk()
+    _CONFIG_ROOT = root
+
+    try:
+        icon = tk.PhotoImage(file=os.path.join(os.path.dirname(__file__), "doom_icon.ico"))
+    except tk.TclError:
+        print("Error: Image file not found or invalid format. Using default icon.")
+        icon = None
+    if icon is not None:
+        root.iconphoto(True, icon)
+
     config = load_config()
     presets = config.get('presets', {})
 
-    root = tk.Tk()
     root.title("Kit Cat DOOM Player")
     root.resizable(False, False)
     root.report_callback_exception = lambda exc, val, tb: messagebox.showerror("Error", str(val))
@@ -330,6 +677,9 @@ def create_gui():
     wad_var = tk.StringVar()
     engine_var = tk.StringVar(value='Auto')
     custom_var = tk.StringVar()
+    # A saved preset may be unavailable here (e.g. zstd on an older Python); show what export will use
+    compression = config.get('export_compression')
+    compression_var = tk.StringVar(value=compression if compression in EXPORT_COMPRESSION else 'fast')
 
     status_bar = ttk.Label(root, text="Ready", anchor='w')
     status_bar.grid(row=7, column=0, columnspan=4, sticky='we', padx=5, pady=(0,5))
@@ -370,18 +720,17 @@ def create_gui():
         try:
             dest = config.get('freedoom_dir', os.path.join(os.path.dirname(__file__), 'iwads'))
             os.makedirs(dest, exist_ok=True)
-            zip_path = os.path.join(dest, 'freedoom-0.13.0.zip')
-            urllib.request.urlretrieve(url, zip_path)
-            with zipfile.ZipFile(zip_path, 'r') as zf:
-                for name in zf.namelist():
-                    if name.lower().endswith('freedoom2.wad'):
-                        zf.extract(name, dest)
-                        freedoom2 = os.path.join(dest, name)
-                        break
-                else:
+            # Keep the archive in memory; only freedoom2.wad is written to disk
+            buf = io.BytesIO()
+            with urllib.request.urlopen(url) as resp:
+                copy_download(resp, buf, status_bar, "Downloading FreeDoom IWAD...")
+            with zipfile.ZipFile(buf, 'r') as zf:
+                target = next((i for i in zf.infolist() if i.filename.lower().endswith('freedoom2.wad')), None)
+                if target is None:
                     messagebox.showerror("Error", "freedoom2.wad not found in archive.")
                     status_bar.config(text="Ready")
                     return
+                freedoom2 = zf.extract(target, dest)
             wad_var.set(freedoom2)
             config['last_wad_dir'] = dest; save_config(config)
             status_bar.config(text="FreeDoom IWAD ready.")
@@ -389,6 +738,14 @@ def create_gui():
             messagebox.showerror("Download Failed", f"Failed to download FreeDoom: {e}")
             status_bar.config(text="Ready")
 
+    def rescan_engines():
+        _which.cache_clear()
+        menu = engine_menu['menu']
+        menu.delete(0, tk.END)
+        for name in ['Auto'] + installed_engines():
+            menu.add_command(label=name, command=tk._setit(engine_var, name))
+        status_bar.config(text="Engines rescanned.")
+
     # Layout
     tk.Label(root, text="Preset:").grid(row=0, column=0, padx=5, pady=5, sticky='e')
     preset_cb = ttk.Combobox(root, textvariable=preset_var, values=list(presets.keys()), state='readonly', width=40)
@@ -405,7 +762,9 @@ def create_gui():
     tk.Button(root, text="Get FreeDoom", command=download_freedoom).grid(row=1, column=3)
 
     tk.Label(root, text="Engine:").grid(row=2, column=0, padx=5, pady=5, sticky='e')
-    tk.OptionMenu(root, engine_var, *(['Auto'] + ENGINES)).grid(row=2, column=1, sticky='w')
+    engine_menu = tk.OptionMenu(root, engine_var, *(['Auto'] + installed_engines()))
+    engine_menu.grid(row=2, column=1, sticky='w')
+    tk.Button(root, text="Rescan", command=rescan_engines).grid(row=2, column=2)
 
     tk.Label(root, text="Custom Engine:").grid(row=3, column=0, padx=5, pady=5, sticky='e')
     tk.Entry(root, textvariable=custom_var, width=50).grid(row=3, column=1)
@@ -422,6 +781,9 @@ def create_gui():
     tk.Button(mod_btn_frame, text="Add Mods...", command=lambda: add_mods(mod_listbox, config)).pack(fill='x', pady=2)
     tk.Button(mod_btn_frame, text="Remove...", command=lambda: remove_selected(mod_listbox)).pack(fill='x', pady=2)
     tk.Button(mod_btn_frame, text="Export...", command=lambda: export_mods(mod_listbox, config, status_bar)).pack(fill='x', pady=2)
+    tk.Label(mod_btn_frame, text="Compression:").pack(fill='x')
+    tk.OptionMenu(mod_btn_frame, compression_var, *EXPORT_COMPRESSION,
+                  command=lambda v: (config.update(export_compression=v), save_config(config))).pack(fill='x', pady=2)
 
     log_widget = scrolledtext.ScrolledText(root, width=80, height=12, state='normal')
     log_widget.grid(row=5, column=0, columnspan=4, padx=5, pady=5)
@@ -443,7 +805,10 @@ def create_gui():
 
     root.mainloop()
 
+    # Write out any edits still waiting on the debounce timer
+    _CONFIG_ROOT = None
+    _flush_config()
+
 
 if __name__ == '__main__':
-    root.iconphoto(True, icon)
     create_gui()